@@ -9,16 +9,21 @@ with Inkscape compatibility issues.
 """
 
 import argparse
+import atexit
+import csv
+import hashlib
+import json
 import os
-import subprocess
+import platform
 import sys
 import tempfile
-import xml.sax.saxutils
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import fitz  # PyMuPDF
-from PIL import Image, ImageFont
+from PIL import Image, ImageFont, ImageOps
 
 
 # Constants
@@ -37,66 +42,253 @@ FONTS = [
     ("LiberationSans-Regular.ttf", "Liberation Sans"),
 ]
 
+# Common font directories, most likely location for the platform first
+if platform.system() == "Darwin":
+    _FONT_DIRS = (
+        "/System/Library/Fonts",
+        "/System/Library/Fonts/Supplemental",
+        "/Library/Fonts",
+        "/opt/homebrew/share/fonts",
+        "/usr/local/share/fonts",
+        "/usr/share/fonts",
+    )
+else:
+    _FONT_DIRS = (
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        "/opt/homebrew/share/fonts",
+        "/System/Library/Fonts",
+        "/System/Library/Fonts/Supplemental",
+        "/Library/Fonts",
+    )
+# Only directories that exist are searched; checked once at import time
+FONT_SEARCH_PATHS = tuple(path for path in _FONT_DIRS if os.path.isdir(path))
+
 FONT_SIZE = 16
 RECTANGLE_COLOR = "#FFFFFF"
 RECTANGLE_OPACITY = 0.9
 TEXT_COLOR = "#000000"
 TEXT_PADDING = 5
 LINE_SPACING = 27
+# Fixed height of the text rectangles, leaving a gap of TEXT_PADDING between
+# the rectangles of consecutive lines
+RECTANGLE_HEIGHT = LINE_SPACING - TEXT_PADDING
+DEFAULT_PDF_DPI = 150
+DEFAULT_PNG_COMPRESS_LEVEL = 6
+JPEG_QUALITY = 85
+EXIF_ORIENTATION_TAG = 0x0112
+# Quality used when background photos have to be re-encoded as JPEG
+REENCODE_JPEG_QUALITY = 95
+# Background images are kept at up to twice the resolution of the SVG canvas
+MAX_BACKGROUND_IMAGE_DIM = 2 * max(A4_WIDTH_PX, A4_HEIGHT_PX)
+
+# Escapes &, < and > (like saxutils.escape) in a single pass over the string
+XML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# SVG group for a single text line, with the constant attributes filled in once
+TEXT_LINE_TEMPLATE = f"""<g>
+    <rect x="%d" y="%d" width="%d" height="%d" 
+          fill="{RECTANGLE_COLOR}" stroke="none" opacity="{RECTANGLE_OPACITY}"/>
+    <text x="%d" y="%d" font-family="%s" font-size="{FONT_SIZE}" 
+          fill="{TEXT_COLOR}" dominant-baseline="central" text-anchor="start">%s</text>
+</g>"""
 
 
-def load_font_with_fallbacks() -> Tuple[ImageFont.FreeTypeFont, str]:
-    """Load font with graceful fallbacks for better compatibility."""
-    print("\n=== Loading Font ===")
-    primary_font_found = False
+def _font_cache_path() -> Path:
+    """Return the location of the font lookup cache file."""
+    if platform.system() == "Darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "hovercraft" / "font_cache.json"
 
-    # Try each font in the fallback chain
-    for font_file, svg_name in FONTS:
-        # Search in common font directories
-        search_paths = [
-            "/usr/share/fonts",
-            "/System/Library/Fonts",
-            "/System/Library/Fonts/Supplemental",
-            "/Library/Fonts",
-            "/opt/homebrew/share/fonts",
-            "/usr/local/share/fonts",
-        ]
 
-        for base_path in search_paths:
-            if not os.path.exists(base_path):
-                continue
+def _font_cache_key(search_paths: List[str]) -> str:
+    """Build a key identifying the platform, font list and search paths."""
+    data = json.dumps([platform.system(), FONTS, search_paths])
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
 
-            # Search recursively in font directories
-            for root, dirs, files in os.walk(base_path):
-                for file in files:
-                    if file.lower() == font_file.lower():
-                        full_path = os.path.join(root, file)
-                        try:
-                            font = ImageFont.truetype(full_path, FONT_SIZE)
-
-                            if font_file == FONTS[0][0]:
-                                primary_font_found = True
-                                print(f"Using primary font: {svg_name} ({full_path})")
-                            else:
-                                print(
-                                    f"Warning: Primary font 'Noto Sans CJK JP Regular' not found."
-                                )
-                                print(f"Using fallback font: {svg_name} ({full_path})")
-                                print("For best Japanese text rendering, install with:")
-                                print(
-                                    "  Ubuntu/Debian: sudo apt install fonts-noto-cjk"
-                                )
-                                print("  macOS: brew install font-noto-sans-cjk")
-
-                            return font, svg_name
-                        except OSError:
+
+def _load_font_cache(
+    search_paths: List[str],
+) -> Optional[Tuple[Dict[str, Optional[str]], bool]]:
+    """
+    Load previously resolved font paths if the cache is still valid.
+
+    Returns the font paths and whether they came from a complete scan.
+    The cache is considered stale if any scanned directory was modified since
+    it was written or if a cached font file no longer exists.
+    """
+    try:
+        with open(_font_cache_path(), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+
+        if cache.get("key") != _font_cache_key(search_paths):
+            return None
+        for dir_path, mtime in cache["dir_mtimes"].items():
+            if os.stat(dir_path).st_mtime != mtime:
+                return None
+        font_paths = cache["fonts"]
+        for full_path in font_paths.values():
+            if full_path is not None and not os.path.isfile(full_path):
+                return None
+        return font_paths, bool(cache["complete"])
+
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _save_font_cache(
+    search_paths: List[str],
+    font_paths: Dict[str, Optional[str]],
+    dir_mtimes: Dict[str, float],
+    complete: bool,
+) -> None:
+    """Persist resolved font paths (including misses) for subsequent runs."""
+    cache_path = _font_cache_path()
+    cache = {
+        "key": _font_cache_key(search_paths),
+        "dir_mtimes": dir_mtimes,
+        "fonts": font_paths,
+        "complete": complete,
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and move it into place, so concurrent or
+        # interrupted runs never leave a truncated cache behind
+        temp_file = tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=cache_path.parent,
+            prefix=".font_cache.",
+            suffix=".tmp",
+            delete=False,
+        )
+        try:
+            with temp_file:
+                json.dump(cache, temp_file, indent=2)
+            os.replace(temp_file.name, cache_path)
+        except OSError:
+            os.unlink(temp_file.name)
+            raise
+    except OSError:
+        pass  # Caching is best-effort
+
+
+def _scan_font_dirs(
+    search_paths: List[str], stop_at_primary: bool = True
+) -> Tuple[Dict[str, Optional[str]], Dict[str, float], bool]:
+    """
+    Locate the files listed in FONTS with a single pass over the font directories.
+
+    Returns the path found for each font file (None if missing), the
+    modification times of all visited directories and whether the scan was
+    complete. With stop_at_primary, the scan stops as soon as the primary font
+    is found, since no fallback is needed as long as it can be opened.
+    """
+    primary_font_file = FONTS[0][0]
+    target_names = {font_file.lower(): font_file for font_file, _ in FONTS}
+    font_paths: Dict[str, Optional[str]] = {font_file: None for font_file, _ in FONTS}
+    dir_mtimes: Dict[str, float] = {}
+
+    for base_path in search_paths:
+        # Search recursively in font directories; scandir's d_type information
+        # tells directories apart from files without an extra stat per entry
+        stack = [base_path]
+        while stack:
+            dir_path = stack.pop()
+            try:
+                dir_mtimes[dir_path] = os.stat(dir_path).st_mtime
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
                             continue
+                        font_file = target_names.get(entry.name.lower())
+                        if font_file is not None and font_paths[font_file] is None:
+                            font_paths[font_file] = entry.path
+            except OSError:
+                continue
+
+            if stop_at_primary and font_paths[primary_font_file] is not None:
+                return font_paths, dir_mtimes, False
+
+    return font_paths, dir_mtimes, True
+
+
+def _open_first_font(
+    font_paths: Dict[str, Optional[str]],
+) -> Optional[Tuple[ImageFont.FreeTypeFont, str, str, str]]:
+    """
+    Open the first font of the fallback chain that was found and can be loaded.
+
+    Returns the font, its file name, SVG font name and path, or None.
+    """
+    for font_file, svg_name in FONTS:
+        full_path = font_paths.get(font_file)
+        if full_path is None:
+            continue
+
+        try:
+            # Pass the path so FreeType maps the file itself instead of Pillow
+            # reading it into memory; basic layout is enough for measuring text
+            font = ImageFont.truetype(
+                full_path, FONT_SIZE, layout_engine=ImageFont.Layout.BASIC
+            )
+        except OSError:
+            continue
+
+        return font, font_file, svg_name, full_path
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_font_with_fallbacks() -> Tuple[ImageFont.FreeTypeFont, str]:
+    """
+    Load font with graceful fallbacks for better compatibility.
+
+    The font is loaded once per process and reused by later calls.
+    """
+    print("\n=== Loading Font ===")
+    search_paths = list(FONT_SEARCH_PATHS)
+
+    # Reuse the result of a previous scan if nothing changed since
+    cached = _load_font_cache(search_paths)
+    if cached is None:
+        font_paths, dir_mtimes, complete = _scan_font_dirs(search_paths)
+        _save_font_cache(search_paths, font_paths, dir_mtimes, complete)
+    else:
+        font_paths, complete = cached
+
+    # Try each font in the fallback chain
+    loaded = _open_first_font(font_paths)
+    if not complete and (loaded is None or loaded[1] != FONTS[0][0]):
+        # The primary font was found but cannot be opened, and the scan stopped
+        # before locating any fallbacks: scan everything
+        font_paths, dir_mtimes, complete = _scan_font_dirs(
+            search_paths, stop_at_primary=False
+        )
+        _save_font_cache(search_paths, font_paths, dir_mtimes, complete)
+        loaded = _open_first_font(font_paths)
+
+    if loaded is not None:
+        font, font_file, svg_name, full_path = loaded
+        if font_file == FONTS[0][0]:
+            print(f"Using primary font: {svg_name} ({full_path})")
+        else:
+            print(f"Warning: Primary font 'Noto Sans CJK JP Regular' not found.")
+            print(f"Using fallback font: {svg_name} ({full_path})")
+            print("For best Japanese text rendering, install with:")
+            print("  Ubuntu/Debian: sudo apt install fonts-noto-cjk")
+            print("  macOS: brew install font-noto-sans-cjk")
+
+        return font, svg_name
 
     # Ultimate fallback to system default
-    if not primary_font_found:
-        print("Warning: Primary font 'Noto Sans CJK JP Regular' not found.")
-        print("Warning: No suitable fallback fonts found. Using system default.")
-        print("Japanese characters may not display correctly.")
+    print("Warning: Primary font 'Noto Sans CJK JP Regular' not found.")
+    print("Warning: No suitable fallback fonts found. Using system default.")
+    print("Japanese characters may not display correctly.")
 
     return ImageFont.load_default(), "sans-serif"
 
@@ -115,32 +307,77 @@ def validate_files(text_file: str, background_file: Optional[str]) -> None:
             raise ValueError(f"Unsupported background file type: {ext}")
 
 
+def background_image_name(
+    background_file: str, page_number: int = 0, image_format: str = "png"
+) -> str:
+    """
+    Return the file name a background is written to in the SVG directory.
+
+    PDF pages are rendered to <pdf name>_page_<page>.<ext>; images are copied
+    under their own name.
+    """
+    path = Path(background_file)
+    if path.suffix.lower() == ".pdf":
+        extension = "jpg" if image_format == "jpeg" else "png"
+        return f"{path.stem}_page_{page_number}.{extension}"
+    return path.name
+
+
+@lru_cache(maxsize=16)
+def _open_pdf(pdf_path: str) -> fitz.Document:
+    """
+    Open a PDF document, reusing it for subsequent pages of the same file.
+
+    Documents stay open until evicted from the cache or the process exits.
+    fitz.Document is not thread-safe, which is fine as each process is
+    single-threaded.
+    """
+    return fitz.open(pdf_path)
+
+
+atexit.register(_open_pdf.cache_clear)
+
+
 def process_pdf_background(
     pdf_path: str,
     page_number: int,
     output_dir: str = ".",
     output_file: str = "output.svg",
+    dpi: int = DEFAULT_PDF_DPI,
+    image_format: str = "png",
+    png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
 ) -> str:
-    """Extract a page from PDF and save as external PNG file."""
+    """
+    Extract a page from PDF and save as external PNG or JPEG file.
+
+    The page is rendered at the given resolution. The SVG canvas is 96 DPI, so
+    the default of 150 DPI leaves headroom for zooming without rendering the
+    many times larger pixmap a print resolution would produce.
+    JPEG is considerably smaller and faster to write for scanned pages; for PNG,
+    a lower compression level trades file size for encoding time.
+    """
     print("\n=== Pre-processing PDF ===")
     try:
-        doc = fitz.open(pdf_path)
-        if page_number >= len(doc):
+        doc = _open_pdf(os.path.abspath(pdf_path))
+        if page_number < 0 or page_number >= len(doc):
             raise ValueError(
                 f"Page {page_number} does not exist in PDF (has {len(doc)} pages)"
             )
 
         page = doc.load_page(page_number)
-        # Render at high resolution (300 DPI)
-        mat = fitz.Matrix(300 / 72, 300 / 72)
-        pix = page.get_pixmap(matrix=mat)
+        # Render at the requested resolution without an alpha channel
+        scale = dpi / 72
+        mat = fitz.Matrix(scale, scale)
+        pix = page.get_pixmap(matrix=mat, alpha=False)
 
-        # Save as external PNG file in the same directory as SVG
-        pdf_name = Path(pdf_path).stem
-        output_filename = f"{pdf_name}_page_{page_number}.png"
+        # Save as external image file in the same directory as SVG
+        output_filename = background_image_name(pdf_path, page_number, image_format)
         output_path = Path(output_dir) / output_filename
-        pix.save(str(output_path))
-        doc.close()
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        if image_format == "jpeg":
+            image.save(output_path, "JPEG", quality=JPEG_QUALITY)
+        else:
+            image.save(output_path, "PNG", compress_level=png_compress_level)
         print(f"Extracted PDF page to: {output_path}")
 
         # Return just the filename for relative reference
@@ -150,61 +387,109 @@ def process_pdf_background(
         raise RuntimeError(f"Error processing PDF: {e}")
 
 
-def normalize_image_orientation(image_path: str) -> str:
+def normalize_image_orientation(img: Image.Image) -> Image.Image:
     """
-    Normalize image orientation using ImageMagick's auto-orient feature.
-    Creates a temporary file with normalized orientation.
+    Normalize image orientation based on its EXIF orientation tag.
+
+    Args:
+        img: Opened input image
+
+    Returns:
+        The rotated/mirrored image, or img itself if it is already upright
+    """
+    orientation = img.getexif().get(EXIF_ORIENTATION_TAG, 1)
+    if orientation == 1:
+        return img
+
+    print(f"Normalizing image orientation (EXIF orientation {orientation})")
+    return ImageOps.exif_transpose(img)
+
+
+def downsample_to_viewport(
+    img: Image.Image, max_dim: int = MAX_BACKGROUND_IMAGE_DIM
+) -> Image.Image:
+    """
+    Downsample an image so that neither side exceeds max_dim pixels.
+
+    Args:
+        img: Opened input image
+        max_dim: Maximum width and height in pixels
+
+    Returns:
+        The downsampled image, or img itself if it already fits
+    """
+    width, height = img.size
+    if max(width, height) <= max_dim:
+        return img
+
+    scale = max_dim / max(width, height)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    print(f"Downsampling image from {width}x{height} to {size[0]}x{size[1]}")
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def prepare_background_image(
+    image_path: str,
+    normalize_orientation: bool = True,
+    max_dim: int = MAX_BACKGROUND_IMAGE_DIM,
+) -> str:
+    """
+    Apply EXIF orientation and downsampling to a background image.
+    Both steps are done in memory and the result is encoded only once, into a
+    temporary file in the same format as the input. Images that need neither
+    step are returned unchanged.
 
     Args:
         image_path: Path to the input image
+        normalize_orientation: Whether to apply the EXIF orientation
+        max_dim: Maximum width and height in pixels
 
     Returns:
-        Path to the normalized image (temporary file)
+        Path to the prepared image (temporary file) or the input path
 
     Raises:
-        RuntimeError: If ImageMagick is not available or command fails
+        RuntimeError: If the image cannot be read or written
     """
-    print("\n=== Normalizing Image Orientation ===")
-    # Check if ImageMagick is available
     try:
-        result = subprocess.run(
-            ["convert", "-version"], capture_output=True, text=True, check=True
-        )
-        print(f"Using ImageMagick: {result.stdout.split()[0:3]}")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        # Try the newer 'magick' command
-        try:
-            result = subprocess.run(
-                ["magick", "-version"], capture_output=True, text=True, check=True
-            )
-            print(f"Using ImageMagick: {result.stdout.split()[0:3]}")
-            convert_cmd = "magick"
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            raise RuntimeError(
-                "ImageMagick not found. Please install ImageMagick to handle EXIF orientation."
+        with Image.open(image_path) as img:
+            icc_profile = img.info.get("icc_profile")
+            prepared = img
+            if normalize_orientation:
+                prepared = normalize_image_orientation(prepared)
+            # Reduce resolution to what the SVG canvas can display
+            prepared = downsample_to_viewport(prepared, max_dim)
+            if prepared is img:
+                return image_path
+
+            # Keep JPEG quality close to the source and preserve its color profile
+            save_options = {"quality": REENCODE_JPEG_QUALITY, "optimize": True}
+            if icc_profile:
+                save_options["icc_profile"] = icc_profile
+            # Carry over EXIF data; it still holds the orientation tag if the
+            # orientation was not applied, while exif_transpose removes the tag
+            exif = prepared.getexif()
+            if exif:
+                save_options["exif"] = exif
+
+            # Create temporary file for prepared image
+            temp_file = tempfile.NamedTemporaryFile(
+                suffix=Path(image_path).suffix, delete=False
             )
-    else:
-        convert_cmd = "convert"
-
-    # Create temporary file for normalized image
-    temp_file = tempfile.NamedTemporaryFile(
-        suffix=Path(image_path).suffix, delete=False
-    )
-    temp_path = temp_file.name
-    temp_file.close()
+            temp_path = temp_file.name
+            temp_file.close()
 
-    try:
-        # Run auto-orient command
-        cmd = [convert_cmd, image_path, "-auto-orient", temp_path]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            try:
+                prepared.save(temp_path, **save_options)
+            except (OSError, ValueError):
+                # Clean up temp file on error
+                os.unlink(temp_path)
+                raise
 
-        print(f"Normalized image orientation: {image_path} -> {temp_path}")
-        return temp_path
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"Failed to prepare image: {e}")
 
-    except subprocess.CalledProcessError as e:
-        # Clean up temp file on error
-        os.unlink(temp_path)
-        raise RuntimeError(f"Failed to normalize image orientation: {e.stderr}")
+    print(f"Prepared image: {image_path} -> {temp_path}")
+    return temp_path
 
 
 def process_image_background(
@@ -215,49 +500,53 @@ def process_image_background(
     print("\n=== Pre-processing Image ===")
     print(f"Processing image: {image_path}")
 
-    # Normalize orientation if requested
+    # Normalize orientation (if requested) and resolution
     working_image_path = image_path
-    temp_file_to_cleanup = None
-
-    if normalize_orientation:
-        try:
-            working_image_path = normalize_image_orientation(image_path)
-            temp_file_to_cleanup = working_image_path
-            print(f"Image orientation normalized")
-        except RuntimeError as e:
-            print(f"Warning: Could not normalize orientation: {e}")
-            print("Proceeding with original image...")
-            working_image_path = image_path
+    try:
+        working_image_path = prepare_background_image(image_path, normalize_orientation)
+    except RuntimeError as e:
+        print(f"Warning: Could not prepare image: {e}")
+        print("Proceeding with original image...")
+
+    # The copy is named after the original image, unless that would replace the
+    # original itself (when it already is in the SVG directory)
+    source = Path(image_path)
+    image_name = source.name
+    if working_image_path != image_path:
+        dest_path = Path(output_file).parent / image_name
+        if dest_path.resolve() == source.resolve():
+            image_name = f"{source.stem}_background{source.suffix}"
 
     try:
         # Copy image to SVG directory and use filename only
-        result = copy_image_to_svg_dir(working_image_path, output_file)
+        result = copy_image_to_svg_dir(working_image_path, output_file, image_name)
         return result
 
     finally:
         # Clean up temporary file if created
-        if temp_file_to_cleanup and temp_file_to_cleanup != image_path:
+        if working_image_path != image_path:
             try:
-                os.unlink(temp_file_to_cleanup)
-                print(f"Cleaned up temporary file: {temp_file_to_cleanup}")
+                os.unlink(working_image_path)
+                print(f"Cleaned up temporary file: {working_image_path}")
             except OSError:
                 pass  # File might already be deleted
 
 
-def calculate_text_dimensions(
-    text: str, font: ImageFont.FreeTypeFont
-) -> Tuple[int, int]:
-    """Calculate the bounding box dimensions of text using PIL."""
-    bbox = font.getbbox(text)
-    width = bbox[2] - bbox[0]
-    height = bbox[3] - bbox[1]
-    return width, height
+@lru_cache(maxsize=None)
+def calculate_text_width(text: str, font: ImageFont.FreeTypeFont) -> int:
+    """
+    Calculate the advance width of text using PIL.
+
+    Only the width is measured, since all rectangles share RECTANGLE_HEIGHT.
+    Results are memoized per (text, font), so repeated lines are only measured once.
+    """
+    return int(font.getlength(text))
 
 
 def create_background_element(background_data: str) -> str:
     """Create SVG background image element using external file reference."""
     # Use external file reference with proper escaping and Inkscape compatibility
-    escaped_path = xml.sax.saxutils.escape(background_data)
+    escaped_path = background_data.translate(XML_ESCAPE_TABLE)
 
     # For better Inkscape compatibility, use both href and xlink:href
     # and ensure proper namespace declaration
@@ -277,11 +566,12 @@ def create_text_line_elements(
     if not text.strip():  # Handle empty lines
         return ""
 
-    text_width, text_height = calculate_text_dimensions(text, font)
+    text_width = calculate_text_width(text, font)
 
-    # Rectangle dimensions with padding
+    # Rectangle dimensions with padding; all lines share the same height so
+    # that the rectangles of adjacent lines do not overlap
     rect_width = text_width + (TEXT_PADDING * 2)
-    rect_height = text_height + (TEXT_PADDING * 2)
+    rect_height = RECTANGLE_HEIGHT
 
     # Position rectangle at left margin
     rect_x = 20
@@ -290,81 +580,350 @@ def create_text_line_elements(
     # Position text properly aligned with rectangle
     # Use the rectangle's center for vertical alignment
     text_x = rect_x + TEXT_PADDING
-    text_y = rect_y + (rect_height / 2)  # Center vertically in rectangle
+    text_y = rect_y + rect_height // 2  # Center vertically in rectangle
+
+    return TEXT_LINE_TEMPLATE % (
+        rect_x,
+        rect_y,
+        rect_width,
+        rect_height,
+        text_x,
+        text_y,
+        font_name,
+        text.translate(XML_ESCAPE_TABLE),
+    )
 
-    return f"""<g>
-    <rect x="{rect_x}" y="{rect_y}" width="{rect_width}" height="{rect_height}" 
-          fill="{RECTANGLE_COLOR}" stroke="none" opacity="{RECTANGLE_OPACITY}"/>
-    <text x="{text_x}" y="{text_y}" font-family="{font_name}" font-size="{FONT_SIZE}" 
-          fill="{TEXT_COLOR}" dominant-baseline="central" text-anchor="start">{xml.sax.saxutils.escape(text)}</text>
-</g>"""
 
+def generate_svg(text_lines: Iterable[str], background_element: str = "") -> str:
+    """
+    Generate the complete SVG document with external image support.
 
-def generate_svg(text_lines: list, background_element: str = "") -> str:
-    """Generate the complete SVG document with external image support."""
-    # Load font for text dimension calculations with fallbacks
-    try:
-        font, font_name = load_font_with_fallbacks()
-    except Exception as e:
-        raise RuntimeError(f"Could not load any font: {e}")
+    text_lines is consumed lazily and may be any iterable of lines without
+    trailing newlines, e.g. a generator over an open file. The font is only
+    loaded once the first non-empty line is encountered.
+    """
+    font = None
+    font_name = FONTS[0][1]
 
     # SVG header with proper namespace declarations for external images
-    svg_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+    # (fragments are collected in a list and joined once at the end)
+    parts = [
+        f"""<?xml version="1.0" encoding="UTF-8"?>
 <svg width="{A4_WIDTH_MM}mm" height="{A4_HEIGHT_MM}mm" 
      viewBox="0 0 {A4_WIDTH_PX} {A4_HEIGHT_PX}" 
      xmlns="http://www.w3.org/2000/svg"
-     xmlns:xlink="http://www.w3.org/1999/xlink">
-"""
+     xmlns:xlink="http://www.w3.org/1999/xlink">"""
+    ]
 
     # Add background if provided
     if background_element:
-        svg_content += f"  {background_element}\n"
+        parts.append(f"  {background_element}")
 
     # Add text lines
     y_position = 40  # Start position from top
     for line in text_lines:
-        line_elements = create_text_line_elements(
-            line.rstrip("\n"), y_position, font, font_name
-        )
-        if line_elements:
-            svg_content += f"  {line_elements}\n"
+        if line.strip():
+            if font is None:
+                # Load font for text dimension calculations with fallbacks
+                try:
+                    font, font_name = load_font_with_fallbacks()
+                except Exception as e:
+                    raise RuntimeError(f"Could not load any font: {e}")
+
+            line_elements = create_text_line_elements(line, y_position, font, font_name)
+            parts.append(f"  {line_elements}")
         y_position += LINE_SPACING
 
     # Close SVG
-    svg_content += "</svg>"
+    parts.append("</svg>")
 
-    return svg_content
+    return "\n".join(parts)
+
+
+def copy_image_to_svg_dir(
+    image_path: str, output_file: str, image_name: Optional[str] = None
+) -> str:
+    """
+    Copy image file to the same directory as the SVG for better compatibility.
 
+    The copy is named image_name, which defaults to the name of image_path.
 
-def copy_image_to_svg_dir(image_path: str, output_file: str) -> str:
-    """Copy image file to the same directory as the SVG for better compatibility."""
+    If possible, the image is hard-linked instead of copied, so no data has to be
+    written. Note that the SVG-dir file then shares its contents with the source:
+    editing the source image in place also changes the image referenced by the SVG.
+    Falls back to a regular copy, e.g. across file systems.
+    """
     import shutil
 
     output_dir = Path(output_file).parent
-    image_name = Path(image_path).name
+    image_name = image_name or Path(image_path).name
     dest_path = output_dir / image_name
 
     # Only copy if it's not already in the same directory
     if Path(image_path).resolve() != dest_path.resolve():
-        shutil.copy2(image_path, dest_path)
-        print(f"Copied image to SVG directory: {dest_path}")
+        if dest_path.exists():
+            if os.path.samefile(image_path, dest_path):
+                return image_name  # Already linked from a previous run
+            dest_path.unlink()
+
+        try:
+            os.link(image_path, dest_path)
+            print(f"Linked image to SVG directory: {dest_path}")
+        except (OSError, NotImplementedError):
+            shutil.copy2(image_path, dest_path)
+            print(f"Copied image to SVG directory: {dest_path}")
 
     return image_name  # Return just the filename for relative reference
 
 
+def process_background(
+    background_file: Optional[str],
+    page_number: int,
+    output_file: str,
+    args: argparse.Namespace,
+) -> str:
+    """Prepare the background file (if any) and return its SVG element."""
+    if not background_file:
+        return ""
+
+    ext = Path(background_file).suffix.lower()
+    if ext == ".pdf":
+        background_data = process_pdf_background(
+            background_file,
+            page_number,
+            Path(output_file).parent,
+            output_file,
+            args.pdf_dpi,
+            args.bg_format,
+            args.png_compress_level,
+        )
+    else:
+        normalize_orientation = not args.no_rotate
+        background_data = process_image_background(
+            background_file, output_file, normalize_orientation
+        )
+    return create_background_element(background_data)
+
+
+def write_svg_file(
+    text_file: str, output_file: str, background_element: str = ""
+) -> None:
+    """Generate the SVG for a text file and write it to output_file."""
+    # Generate SVG, streaming lines from the text file
+    with open(text_file, "r", encoding="utf-8") as f:
+        svg_content = generate_svg(
+            (line.rstrip("\n") for line in f), background_element
+        )
+
+    # Write output as a single UTF-8 buffer directly to the file descriptor,
+    # bypassing the text I/O layer (O_BINARY avoids newline translation on Windows)
+    data = memoryview(svg_content.encode("utf-8"))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    # 0o666 leaves the permissions to the umask, as open() does
+    fd = os.open(output_file, flags, 0o666)
+    try:
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+    finally:
+        os.close(fd)
+
+
+def load_batch_manifest(
+    manifest_path: str,
+) -> List[Tuple[str, Optional[str], str, int]]:
+    """
+    Read batch entries from a CSV manifest.
+
+    Each row has the columns text_file, background_file, output_file and an
+    optional page_number (default 0). The background file may be left empty.
+    Blank rows are skipped.
+
+    Raises:
+        ValueError: If a row has the wrong number of columns or an invalid page
+    """
+    entries = []
+    with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+        for row_number, row in enumerate(csv.reader(f), start=1):
+            row = [field.strip() for field in row]
+            if not any(row):
+                continue
+            if len(row) not in (3, 4):
+                raise ValueError(
+                    f"Invalid manifest row {row_number}: expected 3 or 4 columns, "
+                    f"got {len(row)}"
+                )
+
+            text_file, background_file, output_file = row[:3]
+            try:
+                page_number = int(row[3]) if len(row) == 4 and row[3] else 0
+            except ValueError:
+                raise ValueError(
+                    f"Invalid page number in manifest row {row_number}: {row[3]}"
+                )
+            entries.append(
+                (text_file, background_file or None, output_file, page_number)
+            )
+
+    return entries
+
+
+def _init_batch_worker() -> None:
+    """Load the font once when a batch worker process starts."""
+    load_font_with_fallbacks()
+
+
+def _run_batch_job(job: Tuple[str, str, str]) -> str:
+    """Generate the SVG for a single batch entry and return its output file."""
+    text_file, output_file, background_element = job
+    write_svg_file(text_file, output_file, background_element)
+    print(f"SVG generated successfully: {output_file}")
+    return output_file
+
+
+def run_batch(manifest_path: str, args: argparse.Namespace) -> int:
+    """
+    Process all entries of a batch manifest in a single run.
+
+    The font is loaded once per process and text measurements are shared
+    across entries. Backgrounds are prepared up front in this process, once
+    per distinct file (and PDF page) and output directory, so entries sharing
+    a background reuse the same image and workers never write images
+    concurrently. Entries whose different backgrounds would be written to the
+    same file in an output directory fail instead of overwriting each other.
+    With more than one worker, the SVGs are then generated in a process pool.
+
+    Returns:
+        The number of entries that failed
+    """
+    entries = load_batch_manifest(manifest_path)
+    print(f"\n=== Batch: {len(entries)} entries from {manifest_path} ===")
+
+    failures = 0
+    jobs = []
+    backgrounds: Dict[Tuple[str, int, Path], str] = {}
+    # Background file written per (output directory, file name) and its source
+    background_names: Dict[Tuple[Path, str], Tuple[Tuple[str, int, Path], str]] = {}
+    for text_file, background_file, output_file, page_number in entries:
+        try:
+            validate_files(text_file, background_file)
+
+            background_element = ""
+            if background_file:
+                is_pdf = Path(background_file).suffix.lower() == ".pdf"
+                output_dir = Path(output_file).parent.resolve()
+                key = (
+                    os.path.realpath(background_file),
+                    page_number if is_pdf else 0,
+                    output_dir,
+                )
+
+                # Written names only depend on the source's base name, so
+                # different sources can map to the same file
+                name = background_image_name(
+                    background_file, page_number, args.bg_format
+                )
+                claimed_key, claimed_file = background_names.setdefault(
+                    (output_dir, name), (key, background_file)
+                )
+                if claimed_key != key:
+                    raise ValueError(
+                        f"Background {background_file} conflicts with "
+                        f"{claimed_file}: both would be written to "
+                        f"{output_dir / name}"
+                    )
+
+                if key not in backgrounds:
+                    backgrounds[key] = process_background(
+                        background_file, page_number, output_file, args
+                    )
+                background_element = backgrounds[key]
+
+            jobs.append((text_file, output_file, background_element))
+        except Exception as e:
+            print(f"Error: {output_file}: {e}", file=sys.stderr)
+            failures += 1
+
+    if args.workers > 1:
+        # Resolve the font here first, so workers start from a warm font cache
+        # instead of all scanning the font directories at the same time
+        load_font_with_fallbacks()
+        with ProcessPoolExecutor(
+            max_workers=args.workers, initializer=_init_batch_worker
+        ) as executor:
+            futures = {executor.submit(_run_batch_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error: {futures[future][1]}: {e}", file=sys.stderr)
+                    failures += 1
+    else:
+        for job in jobs:
+            try:
+                _run_batch_job(job)
+            except Exception as e:
+                print(f"Error: {job[1]}: {e}", file=sys.stderr)
+                failures += 1
+
+    succeeded = len(entries) - failures
+    print(f"\n=== Batch finished: {succeeded} of {len(entries)} SVGs generated ===")
+    return failures
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate A4-sized SVG from text file with external image references"
     )
-    parser.add_argument("--txt", required=True, help="Path to input text file")
-    parser.add_argument("--doc", help="Path to background image or PDF")
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("--txt", help="Path to input text file")
+    input_group.add_argument(
+        "--batch-manifest",
+        help="CSV file with rows of text_file,background_file,output_file[,page] "
+        "to process in a single run",
+    )
+    # --doc, --page and --out only apply to single-file mode; in batch mode they
+    # come from the manifest. Defaults are filled in after parsing, so that
+    # explicitly given values can be rejected in batch mode.
+    parser.add_argument(
+        "--doc", help="Path to background image or PDF (not with --batch-manifest)"
+    )
     parser.add_argument(
         "--page",
-        default=0,
-        help="Page number for PDF background (0-indexed)",
+        type=int,
+        help="Page number for PDF background (0-indexed, default: 0; "
+        "not with --batch-manifest)",
+    )
+    parser.add_argument(
+        "--out",
+        help="Output SVG filename (default: output.svg; not with --batch-manifest)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes in batch mode (default: 1)",
     )
     parser.add_argument(
-        "--out", default="output.svg", help="Output SVG filename"
+        "--pdf-dpi",
+        type=int,
+        default=DEFAULT_PDF_DPI,
+        help=f"Resolution for rendering PDF background pages (default: {DEFAULT_PDF_DPI})",
+    )
+    parser.add_argument(
+        "--bg-format",
+        choices=["png", "jpeg"],
+        default="png",
+        help="Image format for PDF background pages (default: png)",
+    )
+    parser.add_argument(
+        "--png-compress-level",
+        type=int,
+        choices=range(10),
+        default=DEFAULT_PNG_COMPRESS_LEVEL,
+        metavar="{0-9}",
+        help="zlib compression level for PNG background pages; lower is faster "
+        f"but larger (default: {DEFAULT_PNG_COMPRESS_LEVEL})",
     )
     parser.add_argument(
         "--no-rotate",
@@ -374,37 +933,40 @@ def main():
 
     args = parser.parse_args()
 
+    if args.batch_manifest:
+        single_file_options = [
+            option
+            for option, value in (
+                ("--doc", args.doc),
+                ("--page", args.page),
+                ("--out", args.out),
+            )
+            if value is not None
+        ]
+        if single_file_options:
+            parser.error(
+                f"{', '.join(single_file_options)} cannot be used with "
+                "--batch-manifest; set them per row in the manifest instead"
+            )
+    else:
+        if args.page is None:
+            args.page = 0
+        if args.out is None:
+            args.out = "output.svg"
+
     try:
+        if args.batch_manifest:
+            if run_batch(args.batch_manifest, args):
+                sys.exit(1)
+            return
+
         # Validate input files
         validate_files(args.txt, args.doc)
 
-        # Read text file
-        with open(args.txt, "r", encoding="utf-8") as f:
-            text_lines = f.readlines()
-
         # Process background if provided
-        background_element = ""
-        if args.doc:
-            output_dir = Path(args.out).parent
-            ext = Path(args.doc).suffix.lower()
-            if ext == ".pdf":
-                background_data = process_pdf_background(
-                    args.doc, args.page, output_dir, args.out
-                )
-                background_element = create_background_element(background_data)
-            else:
-                normalize_orientation = not args.no_rotate
-                background_data = process_image_background(
-                    args.doc, args.out, normalize_orientation
-                )
-                background_element = create_background_element(background_data)
-
-        # Generate SVG
-        svg_content = generate_svg(text_lines, background_element)
+        background_element = process_background(args.doc, args.page, args.out, args)
 
-        # Write output
-        with open(args.out, "w", encoding="utf-8") as f:
-            f.write(svg_content)
+        write_svg_file(args.txt, args.out, background_element)
 
         print("\n=== Generating SVG ===")
         print(f"SVG generated successfully: {args.out}")
@@ -420,6 +982,10 @@ def main():
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+    finally:
+        # Release memoized measurements along with the font they reference
+        calculate_text_width.cache_clear()
+
 
 if __name__ == "__main__":
     main()